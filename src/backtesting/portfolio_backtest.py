@@ -21,6 +21,14 @@ from typing import List, Dict, Optional, Tuple
 import numpy as np
 from datetime import date
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels run as plain NumPy
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 
 @dataclass
 class BacktestResult:
@@ -49,6 +57,95 @@ class BacktestResult:
     turnover_by_year: Dict[int, float]
 
 
+@njit(cache=True)
+def _mask_turnover(
+    old_mask: np.ndarray,
+    new_mask: np.ndarray,
+    n_old: int,
+    n_new: int,
+) -> float:
+    """
+    Turnover between two boolean membership masks over the symbol axis.
+    
+    Turnover = (added + removed) / (2 * average portfolio size), where
+    added + removed is the popcount of old_mask XOR new_mask.
+    """
+    avg_size = (n_old + n_new) / 2
+    if avg_size == 0:
+        return 0.0
+    return (old_mask ^ new_mask).sum() / (2 * avg_size)
+
+
+@njit(cache=True)
+def _run_core(
+    returns: np.ndarray,
+    rd_intensity: np.ndarray,
+    eligible: np.ndarray,
+    universe_order: np.ndarray,
+    n_holdings: int,
+    transaction_cost: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compiled rebalance loop over formation years.
+    
+    Inputs are (period, symbol) arrays already aligned to formation
+    years: rd_intensity holds FY(T-1) values, returns holds T-year
+    returns, eligible the point-in-time universe mask. Each row of
+    universe_order lists symbol indices in universe order, which breaks
+    ties between equal intensities.
+    
+    Returns:
+        Tuple of (net returns, turnover, holdings index matrix padded
+        with -1, holdings count) per period
+    """
+    n_periods, n_symbols = returns.shape
+    net_returns = np.zeros(n_periods)
+    turnover = np.zeros(n_periods)
+    holdings = np.full((n_periods, n_holdings), -1, dtype=np.int64)
+    n_held = np.zeros(n_periods, dtype=np.int64)
+    
+    prev = np.zeros(n_symbols, dtype=np.bool_)
+    n_prev = 0
+    
+    for t in range(n_periods):
+        rd = rd_intensity[t]
+        order = universe_order[t]
+        candidates = order[eligible[t][order] & ~np.isnan(rd[order])]
+        k = min(n_holdings, candidates.size)
+        
+        selected = candidates[:0]
+        if k > 0:
+            scores = rd[candidates]
+            # k-th largest score via partial sort, then keep ties in
+            # universe order
+            threshold = np.partition(scores, candidates.size - k)[candidates.size - k]
+            above = candidates[scores > threshold]
+            ties = candidates[scores == threshold][:k - above.size]
+            selected = np.concatenate((above, ties))
+            selected = selected[np.argsort(-rd[selected], kind="mergesort")]
+        
+        current = np.zeros(n_symbols, dtype=np.bool_)
+        current[selected] = True
+        
+        if n_prev > 0:
+            turnover[t] = _mask_turnover(prev, current, n_prev, k)
+        else:
+            turnover[t] = 1.0  # Initial portfolio is 100% turnover
+        
+        period_returns = returns[t][selected]
+        period_returns = period_returns[~np.isnan(period_returns)]
+        gross = period_returns.mean() if period_returns.size > 0 else 0.0
+        
+        # Apply transaction costs
+        net_returns[t] = gross - turnover[t] * transaction_cost
+        holdings[t, :k] = selected
+        n_held[t] = k
+        prev = current
+        n_prev = k
+    
+    return net_returns, turnover, holdings, n_held
+
+
 class PortfolioBacktester:
     """
     Backtests R&D Alpha portfolio with configurable parameters.
@@ -94,6 +191,184 @@ class PortfolioBacktester:
         self.universe_data = universe_data
         self.risk_free_rates = risk_free_rates or {}
         self.transaction_cost = transaction_cost
+        self._build_matrices()
+        
+        # Memoized per-year inputs, reused across parameter sweeps
+        self._candidate_cache: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._period_cache: Dict[Tuple[int, int], Tuple[np.ndarray, ...]] = {}
+    
+    def _build_matrices(self) -> None:
+        """
+        Materialize the nested dict inputs as dense (symbol, year) arrays.
+        
+        Rows follow self._symbols (sorted), columns run contiguously from
+        self._first_year. Missing observations are stored as NaN so the
+        selection and return calculations reduce to array scans.
+        """
+        self._symbols = sorted(set(self.returns_data) | set(self.financial_data))
+        self._symbol_index = {s: i for i, s in enumerate(self._symbols)}
+        
+        years = set()
+        for yearly in self.returns_data.values():
+            years.update(yearly)
+        for yearly in self.financial_data.values():
+            years.update(yearly)
+        if self.universe_data is not None:
+            years.update(self.universe_data)
+        
+        self._first_year = min(years) if years else 0
+        n_years = (max(years) - self._first_year + 1) if years else 0
+        shape = (len(self._symbols), n_years)
+        
+        self._returns = np.full(shape, np.nan)
+        self._revenue = np.full(shape, np.nan)
+        self._rd_expense = np.full(shape, np.nan)
+        
+        for symbol, yearly in self.returns_data.items():
+            row = self._symbol_index[symbol]
+            for year, ret in yearly.items():
+                if ret is not None:
+                    self._returns[row, year - self._first_year] = ret
+        self._has_return = ~np.isnan(self._returns)
+        
+        for symbol, yearly in self.financial_data.items():
+            row = self._symbol_index[symbol]
+            for year, data in yearly.items():
+                col = year - self._first_year
+                self._revenue[row, col] = data.get("revenue", 0)
+                self._rd_expense[row, col] = data.get("rd_expense", 0)
+        
+        # R&D intensity is only defined for positive revenue and R&D spend
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rd_intensity = (self._rd_expense / self._revenue) * 100.0
+        valid = (self._revenue > 0) & (self._rd_expense > 0)
+        self._rd_intensity = np.where(valid, rd_intensity, np.nan)
+        
+        # Without membership history every symbol with returns is eligible
+        self._in_returns = np.zeros(len(self._symbols), dtype=bool)
+        for symbol in self.returns_data:
+            self._in_returns[self._symbol_index[symbol]] = True
+        
+        # Universe order (membership list, or returns_data insertion order)
+        # breaks ties between equal intensities, as the original stable
+        # sort over get_eligible_universe did. Each row is a permutation
+        # of symbol indices: members in universe order, then the rest.
+        returns_rows = [self._symbol_index[s] for s in self.returns_data]
+        self._default_order = np.array(
+            returns_rows + list(np.flatnonzero(~self._in_returns)), dtype=np.intp
+        )
+        
+        if self.universe_data is None:
+            self._universe_mask = np.broadcast_to(
+                self._in_returns, (n_years, len(self._symbols))
+            )
+            self._universe_order = np.broadcast_to(
+                self._default_order, (n_years, len(self._symbols))
+            )
+        else:
+            self._universe_mask = np.zeros((n_years, len(self._symbols)), dtype=bool)
+            self._universe_order = np.tile(
+                np.arange(len(self._symbols), dtype=np.intp), (n_years, 1)
+            )
+            for year, members in self.universe_data.items():
+                rows = list(dict.fromkeys(
+                    self._symbol_index[s] for s in members if s in self._symbol_index
+                ))
+                col = year - self._first_year
+                self._universe_mask[col, rows] = True
+                self._universe_order[col] = np.concatenate((
+                    np.array(rows, dtype=np.intp),
+                    np.flatnonzero(~self._universe_mask[col]),
+                ))
+    
+    def _year_index(self, year: int) -> Optional[int]:
+        """Column index for a year, or None if outside the data range."""
+        col = year - self._first_year
+        if 0 <= col < self._returns.shape[1]:
+            return col
+        return None
+    
+    def _eligible_mask(self, formation_year: int) -> np.ndarray:
+        """Boolean mask over self._symbols of point-in-time eligibility."""
+        col = self._year_index(formation_year)
+        if col is not None:
+            return self._universe_mask[col]
+        if self.universe_data is None:
+            return self._in_returns
+        return np.zeros(len(self._symbols), dtype=bool)
+    
+    def _eligible_order(self, formation_year: int) -> np.ndarray:
+        """Symbol indices in eligible-universe order (members first)."""
+        col = self._year_index(formation_year)
+        if col is not None:
+            return self._universe_order[col]
+        return self._default_order
+    
+    def _align_to_years(self, matrix: np.ndarray, years: List[int]) -> np.ndarray:
+        """Gather (symbol, year) columns as (period, symbol) rows, NaN outside range."""
+        aligned = np.full((len(years), len(self._symbols)), np.nan)
+        for t, year in enumerate(years):
+            col = self._year_index(year)
+            if col is not None:
+                aligned[t] = matrix[:, col]
+        return aligned
+    
+    def _candidates(self, formation_year: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Eligible symbol indices with FY(T-1) R&D data, and their intensities.
+        
+        Candidates are listed in eligible-universe order, which is the
+        tie-break for equal intensities.
+        
+        Cached per formation year so repeated selections (different n or
+        min_rd_intensity) skip the full-universe mask scan.
+        """
+        cached = self._candidate_cache.get(formation_year)
+        if cached is not None:
+            return cached
+        
+        data_col = self._year_index(formation_year - 1)
+        if data_col is None:
+            candidates = np.zeros(0, dtype=np.intp)
+            intensities = np.zeros(0)
+        else:
+            rd_col = self._rd_intensity[:, data_col]
+            order = self._eligible_order(formation_year)
+            valid = self._eligible_mask(formation_year) & ~np.isnan(rd_col)
+            candidates = order[valid[order]]
+            intensities = rd_col[candidates]
+        
+        self._candidate_cache[formation_year] = (candidates, intensities)
+        return candidates, intensities
+    
+    def _period_inputs(self, start_year: int, end_year: int) -> Tuple[np.ndarray, ...]:
+        """
+        Returns, FY(T-1) R&D intensity, eligibility and universe order
+        aligned to formation years.
+        
+        Cached per (start_year, end_year) so sweeps over n_holdings reuse
+        the same (period, symbol) arrays.
+        """
+        key = (start_year, end_year)
+        cached = self._period_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        years = list(range(start_year, end_year + 1))
+        eligible = np.zeros((len(years), len(self._symbols)), dtype=bool)
+        universe_order = np.zeros((len(years), len(self._symbols)), dtype=np.intp)
+        for t, year in enumerate(years):
+            eligible[t] = self._eligible_mask(year)
+            universe_order[t] = self._eligible_order(year)
+        
+        inputs = (
+            self._align_to_years(self._returns, years),
+            self._align_to_years(self._rd_intensity, [y - 1 for y in years]),
+            eligible,
+            universe_order,
+        )
+        self._period_cache[key] = inputs
+        return inputs
     
     def get_risk_free_rate(self, year: int) -> float:
         """Get risk-free rate for a year."""
@@ -117,20 +392,15 @@ class PortfolioBacktester:
         This ensures we only use data that was available
         at the time of portfolio formation.
         """
-        if symbol not in self.financial_data:
+        row = self._symbol_index.get(symbol)
+        col = self._year_index(fiscal_year)
+        if row is None or col is None:
             return None
         
-        year_data = self.financial_data[symbol].get(fiscal_year)
-        if year_data is None:
+        rd_intensity = self._rd_intensity[row, col]
+        if np.isnan(rd_intensity):
             return None
-        
-        revenue = year_data.get("revenue", 0)
-        rd_expense = year_data.get("rd_expense", 0)
-        
-        if revenue <= 0 or rd_expense <= 0:
-            return None
-        
-        return (rd_expense / revenue) * 100.0
+        return float(rd_intensity)
     
     def select_holdings(
         self,
@@ -149,19 +419,27 @@ class PortfolioBacktester:
             min_rd_intensity: Minimum R&D/Revenue threshold
             
         Returns:
-            List of (symbol, rd_intensity) tuples, sorted by intensity
+            List of (symbol, rd_intensity) tuples, sorted by intensity;
+            equal intensities keep their eligible-universe order
         """
-        data_year = formation_year - 1
-        eligible = self.get_eligible_universe(formation_year)
-        
-        candidates = []
-        for symbol in eligible:
-            rd_intensity = self.get_rd_intensity(symbol, data_year)
-            if rd_intensity is not None and rd_intensity >= min_rd_intensity:
-                candidates.append((symbol, rd_intensity))
+        candidates, scores = self._candidates(formation_year)
+        above_min = scores >= min_rd_intensity
+        candidates, scores = candidates[above_min], scores[above_min]
+        if n <= 0 or candidates.size == 0:
+            return []
         
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return candidates[:n]
+        # k-th largest score via partial sort, then keep ties in universe
+        # order (as _run_core does) and sort only the selected n
+        k = min(n, candidates.size)
+        threshold = np.partition(scores, candidates.size - k)[candidates.size - k]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - above.size]
+        top = np.concatenate((above, ties))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (self._symbols[i], float(score))
+            for i, score in zip(candidates[top], scores[top])
+        ]
     
     def calculate_turnover(
         self,
@@ -185,30 +463,33 @@ class PortfolioBacktester:
         
         return (added + removed) / (2 * avg_size)
     
+    def _portfolio_return(self, holdings_idx: np.ndarray, year_idx: int) -> float:
+        """Equal-weighted mean return of symbol rows in one year column."""
+        has_return = self._has_return[holdings_idx, year_idx]
+        if not has_return.any():
+            return 0.0
+        return float(self._returns[holdings_idx[has_return], year_idx].mean())
+    
     def calculate_portfolio_return(
         self,
         holdings: List[str],
         year: int,
-        equal_weight: bool = True,
     ) -> float:
         """
-        Calculate portfolio return for a holding period.
+        Calculate equal-weighted portfolio return for a holding period.
         
-        Uses July-June returns (Fama-French convention).
+        Uses July-June returns (Fama-French convention). Holdings without
+        a return for the year are excluded from the average.
         """
-        returns = []
-        for symbol in holdings:
-            if symbol in self.returns_data:
-                ret = self.returns_data[symbol].get(year)
-                if ret is not None:
-                    returns.append(ret)
-        
-        if not returns:
+        col = self._year_index(year)
+        if col is None:
             return 0.0
         
-        if equal_weight:
-            return np.mean(returns)
-        return np.mean(returns)  # Extend for score-weighting if needed
+        rows = np.fromiter(
+            (self._symbol_index[s] for s in holdings if s in self._symbol_index),
+            dtype=np.intp,
+        )
+        return self._portfolio_return(rows, col)
     
     def run(
         self,
@@ -216,6 +497,7 @@ class PortfolioBacktester:
         end_year: int,
         n_holdings: int = 20,
         benchmark_returns: Optional[Dict[int, float]] = None,
+        min_rd_intensity: float = 0.0,
     ) -> BacktestResult:
         """
         Run full backtest simulation.
@@ -225,57 +507,145 @@ class PortfolioBacktester:
             end_year: Last formation year
             n_holdings: Number of holdings per year
             benchmark_returns: {year: sp500_return} for comparison
+            min_rd_intensity: Minimum R&D/Revenue threshold
             
         Returns:
             BacktestResult with all metrics
         """
-        yearly_returns = {}
-        holdings_by_year = {}
-        turnover_by_year = {}
+        years = list(range(start_year, end_year + 1))
+        returns, rd_intensity, eligible, universe_order = self._period_inputs(start_year, end_year)
         
-        prev_holdings = []
+        if min_rd_intensity > 0:
+            with np.errstate(invalid="ignore"):
+                rd_intensity = np.where(rd_intensity >= min_rd_intensity, rd_intensity, np.nan)
         
-        for year in range(start_year, end_year + 1):
-            holdings_with_rd = self.select_holdings(year, n=n_holdings)
-            holdings = [h[0] for h in holdings_with_rd]
-            
-            if prev_holdings:
-                turnover = self.calculate_turnover(prev_holdings, holdings)
-            else:
-                turnover = 1.0  # Initial portfolio is 100% turnover
-            
-            portfolio_return = self.calculate_portfolio_return(holdings, year)
+        net_returns, turnover, holdings, n_held = _run_core(
+            returns,
+            rd_intensity,
+            eligible,
+            universe_order,
+            n_holdings,
+            self.transaction_cost,
+        )
+        
+        return self._build_result(
+            years, net_returns, turnover, holdings, n_held, benchmark_returns
+        )
+    
+    def run_grid(
+        self,
+        start_year: int,
+        end_year: int,
+        n_list: List[int],
+        min_list: Optional[List[float]] = None,
+        benchmark_returns: Optional[Dict[int, float]] = None,
+    ) -> Dict[Tuple[int, float], BacktestResult]:
+        """
+        Run the backtest for every (n_holdings, min_rd_intensity) pair.
+        
+        Candidates are ranked once per formation year. Every configuration
+        holds a prefix of that ranking, so portfolio returns come from
+        prefix sums over the ranked returns and the sort is shared by the
+        whole grid. Results match calling run() once per configuration.
+        
+        Args:
+            start_year: First formation year
+            end_year: Last formation year
+            n_list: Holdings counts to test
+            min_list: R&D/Revenue thresholds to test (default [0.0])
+            benchmark_returns: {year: sp500_return} for comparison
             
-            # Apply transaction costs
-            net_return = portfolio_return - (turnover * self.transaction_cost)
+        Returns:
+            {(n_holdings, min_rd_intensity): BacktestResult}
+        """
+        min_list = min_list if min_list is not None else [0.0]
+        years = list(range(start_year, end_year + 1))
+        returns, rd_intensity, eligible, universe_order = self._period_inputs(start_year, end_year)
+        n_periods, n_symbols = returns.shape
+        periods = np.arange(n_periods)
+        
+        # One stable descending sort per year over the universe order, so
+        # ties keep their universe position
+        ranked = np.where(eligible & ~np.isnan(rd_intensity), rd_intensity, -np.inf)
+        ranked = np.take_along_axis(ranked, universe_order, axis=1)
+        by_score = np.argsort(-ranked, axis=1, kind="stable")
+        order = np.take_along_axis(universe_order, by_score, axis=1)
+        ranked_rd = np.take_along_axis(ranked, by_score, axis=1)
+        ranked_returns = np.take_along_axis(returns, order, axis=1)
+        
+        # Prefix sums: column k holds the sum/count over the top k names
+        has_return = ~np.isnan(ranked_returns)
+        zeros = np.zeros((n_periods, 1))
+        return_sum = np.hstack((zeros, np.cumsum(np.where(has_return, ranked_returns, 0.0), axis=1)))
+        return_count = np.hstack((zeros, np.cumsum(has_return, axis=1)))
+        
+        results = {}
+        for min_rd in min_list:
+            n_candidates = (ranked_rd >= min_rd).sum(axis=1)
             
-            yearly_returns[year] = net_return
-            holdings_by_year[year] = holdings
-            turnover_by_year[year] = turnover
-            prev_holdings = holdings
+            for n in n_list:
+                n_held = np.minimum(n, n_candidates)
+                total = return_sum[periods, n_held]
+                count = return_count[periods, n_held]
+                gross = np.divide(total, count, out=np.zeros(n_periods), where=count > 0)
+                
+                turnover = np.ones(n_periods)  # Initial portfolio is 100% turnover
+                holdings = np.full((n_periods, n), -1, dtype=np.int64)
+                prev = np.zeros(n_symbols, dtype=bool)
+                for t in range(n_periods):
+                    selected = order[t, :n_held[t]]
+                    current = np.zeros(n_symbols, dtype=bool)
+                    current[selected] = True
+                    if t > 0 and n_held[t - 1] > 0:
+                        turnover[t] = _mask_turnover(prev, current, n_held[t - 1], n_held[t])
+                    holdings[t, :n_held[t]] = selected
+                    prev = current
+                
+                net_returns = gross - turnover * self.transaction_cost
+                results[(n, min_rd)] = self._build_result(
+                    years, net_returns, turnover, holdings, n_held, benchmark_returns
+                )
+        
+        return results
+    
+    def _build_result(
+        self,
+        years: List[int],
+        net_returns: np.ndarray,
+        turnover: np.ndarray,
+        holdings: np.ndarray,
+        n_held: np.ndarray,
+        benchmark_returns: Optional[Dict[int, float]],
+    ) -> BacktestResult:
+        """Pack per-period arrays into a BacktestResult with aggregate metrics."""
+        yearly_returns = {}
+        holdings_by_year = {}
+        turnover_by_year = {}
+        
+        for t, year in enumerate(years):
+            yearly_returns[year] = float(net_returns[t])
+            holdings_by_year[year] = [
+                self._symbols[i] for i in holdings[t, :n_held[t]]
+            ]
+            turnover_by_year[year] = float(turnover[t])
         
         benchmark = benchmark_returns or {}
         
-        # Calculate aggregate metrics
-        returns_list = list(yearly_returns.values())
-        if returns_list:
-            cumulative = np.prod([1 + r for r in returns_list])
-            total_return = cumulative - 1
-            n_years = len(returns_list)
-            annualized = (cumulative ** (1 / n_years)) - 1 if n_years > 0 else 0.0
-            volatility = np.std(returns_list) if len(returns_list) > 1 else 0.0
+        # Calculate aggregate metrics from one growth array
+        if net_returns.size:
+            cumulative = np.cumprod(1 + net_returns)
+            total_return = float(cumulative[-1] - 1)
+            n_years = net_returns.size
+            annualized = float(cumulative[-1] ** (1 / n_years) - 1)
+            volatility = float(net_returns.std()) if n_years > 1 else 0.0
             
-            avg_rf = np.mean([
-                self.get_risk_free_rate(y) for y in yearly_returns.keys()
-            ])
+            avg_rf = np.mean([self.get_risk_free_rate(y) for y in years])
             excess_return = annualized - avg_rf
             sharpe = excess_return / volatility if volatility > 0 else 0.0
             
             # Max drawdown
-            cumulative_returns = np.cumprod([1 + r for r in returns_list])
-            peak = np.maximum.accumulate(cumulative_returns)
-            drawdown = (cumulative_returns - peak) / peak
-            max_drawdown = abs(np.min(drawdown))
+            peak = np.maximum.accumulate(cumulative)
+            max_drawdown = float((1 - cumulative / peak).max())
         else:
             total_return = 0.0
             annualized = 0.0
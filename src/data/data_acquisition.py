@@ -15,14 +15,43 @@ Data Sources:
 API Documentation: https://site.financialmodelingprep.com/developer/docs
 """
 
+import asyncio
+import json
 import os
 import time
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from operator import itemgetter
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+if TYPE_CHECKING:
+    import aiohttp
 
-@dataclass
+try:
+    import requests_cache
+except ImportError:  # response caching is optional
+    requests_cache = None
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib parser
+    orjson = None
+
+
+def _loads(content: bytes):
+    """Parse a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+@dataclass(slots=True)
 class IncomeStatement:
     """Annual income statement data."""
     symbol: str
@@ -33,7 +62,7 @@ class IncomeStatement:
     period: str = "FY"
 
 
-@dataclass
+@dataclass(slots=True)
 class CompanyProfile:
     """Company profile with sector classification."""
     symbol: str
@@ -44,6 +73,65 @@ class CompanyProfile:
     exchange: str
 
 
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    
+    Starts empty, holds at most `burst` tokens and refills at
+    `rate - burst` tokens per `per` seconds, so no window of `per`
+    seconds ever admits more than `rate` requests, even right after an
+    idle spell. Each request takes one token, blocking until one is free.
+    """
+    
+    def __init__(self, rate: int, per: float, burst: int = 1):
+        self.rate = rate
+        self.per = per
+        self.burst = max(1, min(burst, rate - 1))
+        self._refill_rate = max(rate - self.burst, 1) / per
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self) -> float:
+        """Consume a token if available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self._updated) * self._refill_rate
+            self._tokens = min(self.burst, self._tokens + refill)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._refill_rate
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while (wait := self._try_acquire()) > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self) -> None:
+        """Await a token without blocking the event loop."""
+        while (wait := self._try_acquire()) > 0:
+            await asyncio.sleep(wait)
+
+
+class _RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that runs a rate-limit hook before each network send.
+    
+    CachedSession answers cache hits without calling the adapter, so
+    only requests that actually go over the network are throttled.
+    """
+    
+    def __init__(self, before_send, **kwargs):
+        self._before_send = before_send
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        self._before_send()
+        return super().send(request, **kwargs)
+
+
 class FMPClient:
     """
     Client for Financial Modeling Prep API.
@@ -52,39 +140,145 @@ class FMPClient:
     Free tier: 250 requests/day
     Starter tier: 300 requests/minute
     
+    The client is safe to share across threads: requests draw from a
+    shared token bucket and one keep-alive session whose connection pool
+    is sized for the fetch thread pool. Transient failures (429 and 5xx
+    gateway errors) are retried with exponential backoff.
+    
+    When requests-cache is installed, GET responses are cached in a
+    SQLite file (FMP_CACHE environment variable, default "fmp_cache")
+    for one day, keyed on URL and parameters.
+    
     Usage:
         client = FMPClient()
         income = client.get_income_statement("AAPL")
     """
     
     BASE_URL = "https://financialmodelingprep.com/api/v3"
+    DEFAULT_REQUESTS_PER_MINUTE = 300  # Starter tier
+    CACHE_EXPIRE_AFTER = timedelta(days=1)
+    REQUEST_TIMEOUT = 30  # seconds
+    REQUEST_BURST = 5  # requests allowed back to back
+    RETRY_TOTAL = 3
+    RETRY_BACKOFF = 0.5  # seconds, doubled on each retry
+    RETRY_STATUSES = (429, 502, 503, 504)
+    ENDPOINT_WINDOW_DAYS = 7  # covers weekends and market holidays
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        use_cache: bool = True,
+    ):
         self.api_key = api_key or os.getenv("FMP_API_KEY")
         if not self.api_key:
             raise ValueError("FMP_API_KEY required. Set environment variable or pass api_key.")
+        self.use_cache = use_cache and requests_cache is not None
         self._request_count = 0
-        self._last_request = 0
+        self._bucket = TokenBucket(
+            rate=requests_per_minute, per=60.0, burst=self.REQUEST_BURST
+        )
+        self._count_lock = threading.Lock()
+        self._session = self._make_session()
+    
+    def _make_session(self) -> requests.Session:
+        """Shared session with connection pooling, keep-alive and retries."""
+        if self.use_cache:
+            session = requests_cache.CachedSession(
+                cache_name=os.getenv("FMP_CACHE", "fmp_cache"),
+                backend="sqlite",
+                expire_after=self.CACHE_EXPIRE_AFTER,
+                allowable_methods=["GET"],
+                ignored_parameters=["apikey"],
+            )
+        else:
+            session = requests.Session()
+        
+        retry = Retry(
+            total=self.RETRY_TOTAL,
+            backoff_factor=self.RETRY_BACKOFF,
+            status_forcelist=list(self.RETRY_STATUSES),
+        )
+        session.mount(
+            "https://",
+            _RateLimitedAdapter(
+                self._rate_limit,
+                pool_connections=4,
+                pool_maxsize=20,
+                max_retries=retry,
+            ),
+        )
+        return session
     
     def _rate_limit(self):
-        """Simple rate limiting: max 5 requests per second."""
-        now = time.time()
-        if now - self._last_request < 0.2:
-            time.sleep(0.2 - (now - self._last_request))
-        self._last_request = time.time()
-        self._request_count += 1
+        """Wait for a token from the shared per-minute budget before a network send."""
+        self._bucket.acquire()
+        with self._count_lock:
+            self._request_count += 1
     
     def _get(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
-        """Make GET request to FMP API."""
-        self._rate_limit()
-        
+        """Make GET request to FMP API (rate-limited in the session adapter)."""
         url = f"{self.BASE_URL}/{endpoint}"
         params = params or {}
         params["apikey"] = self.api_key
         
-        response = requests.get(url, params=params)
+        response = self._session.get(url, params=params, timeout=self.REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
+    
+    async def _aget(
+        self,
+        session: "aiohttp.ClientSession",
+        endpoint: str,
+        params: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Make GET request to FMP API on a shared aiohttp session.
+        
+        Mirrors the sync session's retry policy: 429 and 5xx gateway
+        errors, and connection failures, are retried up to RETRY_TOTAL
+        times with exponential backoff, honouring a Retry-After header.
+        Every attempt takes a token from the shared bucket.
+        """
+        import aiohttp
+        
+        url = f"{self.BASE_URL}/{endpoint}"
+        params = params or {}
+        params["apikey"] = self.api_key
+        
+        for attempt in range(self.RETRY_TOTAL + 1):
+            await self._bucket.acquire_async()
+            with self._count_lock:
+                self._request_count += 1
+            
+            delay = self.RETRY_BACKOFF * 2 ** attempt
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status in self.RETRY_STATUSES and attempt < self.RETRY_TOTAL:
+                        delay = self._retry_after(response.headers.get("Retry-After"), delay)
+                    else:
+                        response.raise_for_status()
+                        return _loads(await response.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.RETRY_TOTAL:
+                    raise
+            
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _retry_after(header: Optional[str], default: float) -> float:
+        """Seconds to wait from a Retry-After header (seconds or HTTP date)."""
+        if not header:
+            return default
+        try:
+            return max(float(header), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return default
+        return max(retry_at.timestamp() - time.time(), 0.0)
     
     def get_income_statements(
         self,
@@ -102,7 +296,70 @@ class FMPClient:
             List of IncomeStatement objects, most recent first
         """
         data = self._get(f"income-statement/{symbol}", {"limit": limit})
+        return self._parse_income_statements(symbol, data)
+    
+    async def get_income_statements_many(
+        self,
+        symbols: List[str],
+        limit: int = 10,
+        max_concurrency: int = 20,
+    ) -> Dict[str, List[IncomeStatement]]:
+        """
+        Fetch annual income statements for many symbols concurrently.
+        
+        Requests share one pooled aiohttp session and the client's token
+        bucket, with the same timeout and retry policy as the sync client
+        (but no response cache). Symbols that still fail are reported and
+        left out of the result.
+        
+        Args:
+            symbols: Stock tickers
+            limit: Number of years to fetch per symbol
+            max_concurrency: Maximum requests in flight
+            
+        Returns:
+            {symbol: List of IncomeStatement objects, most recent first}
+        """
+        import aiohttp
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        connector = aiohttp.TCPConnector(limit=max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def fetch(symbol: str) -> List[IncomeStatement]:
+                async with semaphore:
+                    data = await self._aget(
+                        session, f"income-statement/{symbol}", {"limit": limit}
+                    )
+                return self._parse_income_statements(symbol, data)
+            
+            results = await asyncio.gather(
+                *(fetch(symbol) for symbol in symbols), return_exceptions=True
+            )
         
+        statements = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"  Error fetching {symbol}: {result}")
+                continue
+            statements[symbol] = result
+        return statements
+    
+    def get_income_statements_batch(
+        self,
+        symbols: List[str],
+        limit: int = 10,
+        max_concurrency: int = 20,
+    ) -> Dict[str, List[IncomeStatement]]:
+        """Synchronous wrapper around get_income_statements_many."""
+        return asyncio.run(
+            self.get_income_statements_many(symbols, limit, max_concurrency)
+        )
+    
+    @staticmethod
+    def _parse_income_statements(symbol: str, data: List[Dict]) -> List[IncomeStatement]:
+        """Convert raw income-statement records to annual IncomeStatements."""
         statements = []
         for item in data:
             if item.get("period") != "FY":
@@ -192,25 +449,39 @@ class FMPClient:
             july_june: If True, use July Y to June Y+1 (Fama-French)
                       If False, use calendar year
                       
+        Only short windows at each end of the period are requested, since
+        the return needs just the first and last close. If either window
+        is empty (e.g. a mid-period listing), the full range is fetched.
+        
         Returns:
             Annual return as decimal (e.g., 0.15 for 15%)
         """
         if july_june:
-            from_date = f"{year}-07-01"
-            to_date = f"{year + 1}-06-30"
+            from_date = date(year, 7, 1)
+            to_date = date(year + 1, 6, 30)
         else:
-            from_date = f"{year}-01-01"
-            to_date = f"{year}-12-31"
+            from_date = date(year, 1, 1)
+            to_date = date(year, 12, 31)
         
-        prices = self.get_historical_price(symbol, from_date, to_date)
-        
-        if len(prices) < 2:
-            return None
+        window = timedelta(days=self.ENDPOINT_WINDOW_DAYS)
+        start_bars = self.get_historical_price(
+            symbol, from_date.isoformat(), (from_date + window).isoformat()
+        )
+        end_bars = self.get_historical_price(
+            symbol, (to_date - window).isoformat(), to_date.isoformat()
+        )
         
-        prices.sort(key=lambda x: x["date"])
+        if not start_bars or not end_bars:
+            start_bars = end_bars = self.get_historical_price(
+                symbol, from_date.isoformat(), to_date.isoformat()
+            )
+            if len(start_bars) < 2:
+                return None
         
-        start_price = prices[0]["close"]
-        end_price = prices[-1]["close"]
+        # ISO dates compare correctly as strings
+        by_date = itemgetter("date")
+        start_price = min(start_bars, key=by_date)["close"]
+        end_price = max(end_bars, key=by_date)["close"]
         
         if start_price <= 0:
             return None
@@ -218,20 +489,96 @@ class FMPClient:
         return (end_price / start_price) - 1
 
 
+# Arrow type of each column in the Parquet outputs, so files with no rows
+# still carry the expected layout
+_INCOME_COLUMNS = {
+    "symbol": "string", "fiscal_year": "int64", "revenue": "float64",
+    "rd_expense": "float64", "net_income": "float64",
+}
+_PROFILE_COLUMNS = {
+    "symbol": "string", "name": "string", "sector": "string",
+    "industry": "string", "market_cap": "float64", "exchange": "string",
+}
+_RETURN_COLUMNS = {"symbol": "string", "year": "int64", "annual_return": "float64"}
+
+
+def _fetch_symbol(
+    client: FMPClient,
+    symbol: str,
+    years: int,
+    include_profile: bool = False,
+    include_returns: bool = False,
+) -> Tuple[List[IncomeStatement], Optional[CompanyProfile], List[Tuple[int, float]], List[str]]:
+    """
+    Fetch statements and, optionally, profile and July-June returns for one symbol.
+    
+    A failure fetching the profile or a return is recorded and does not
+    discard the statements; only a failed statements request raises.
+    
+    Returns:
+        Tuple of (statements, profile or None, [(year, return)], error messages)
+    """
+    statements = client.get_income_statements(symbol, limit=years)
+    profile = None
+    annual_returns = []
+    errors = []
+    
+    if include_profile:
+        try:
+            profile = client.get_company_profile(symbol)
+        except Exception as e:
+            errors.append(f"profile: {e}")
+    
+    if include_returns:
+        # FY(T-1) financials pair with the T-year July-June return;
+        # skip holding periods that have not finished yet
+        for fiscal_year in sorted({stmt.fiscal_year for stmt in statements}):
+            year = fiscal_year + 1
+            if date(year + 1, 6, 30) >= date.today():
+                continue
+            try:
+                ret = client.calculate_annual_return(symbol, year)
+            except Exception as e:
+                errors.append(f"{year} return: {e}")
+                continue
+            if ret is not None:
+                annual_returns.append((year, ret))
+    
+    return statements, profile, annual_returns, errors
+
+
 def fetch_research_data(
     symbols: List[str],
     years: int = 10,
     output_dir: str = "data/raw",
+    max_workers: int = 8,
+    include_profiles: bool = False,
+    include_returns: bool = False,
 ) -> None:
     """
     Fetch all required data for R&D Alpha research.
     
-    Creates CSV files:
-        income_statements.csv
-        company_profiles.csv
-        annual_returns.csv
+    Symbols are fetched concurrently on a thread pool; the client's
+    token bucket keeps the combined request rate within the API tier.
+    
+    By default only income statements are fetched (one request per
+    symbol). Profiles add one request per symbol; returns add about two
+    price requests per symbol and year, so enable them only on a tier
+    with the request budget for it.
+    
+    Creates zstd-compressed Parquet files:
+        income_statements.parquet
+        company_profiles.parquet (if include_profiles)
+        annual_returns.parquet (if include_returns; July-June, formation years FY+1)
+    
+    Args:
+        symbols: Stock tickers
+        years: Number of fiscal years of statements per symbol
+        output_dir: Directory for the Parquet files
+        max_workers: Number of fetch threads
+        include_profiles: Also fetch company profiles
+        include_returns: Also fetch annual July-June returns
     """
-    import csv
     import os
     
     os.makedirs(output_dir, exist_ok=True)
@@ -239,30 +586,107 @@ def fetch_research_data(
     
     print(f"Fetching data for {len(symbols)} symbols...")
     
-    # Income statements
-    with open(f"{output_dir}/income_statements.csv", "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["symbol", "fiscal_year", "revenue", "rd_expense", "net_income"])
-        
-        for i, symbol in enumerate(symbols):
+    income = {column: [] for column in _INCOME_COLUMNS}
+    profiles = {column: [] for column in _PROFILE_COLUMNS}
+    annual_returns = {column: [] for column in _RETURN_COLUMNS}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _fetch_symbol, client, symbol, years, include_profiles, include_returns
+            ): symbol
+            for symbol in symbols
+        }
+        for i, future in enumerate(as_completed(futures)):
+            symbol = futures[future]
             try:
-                statements = client.get_income_statements(symbol, limit=years)
-                for stmt in statements:
-                    writer.writerow([
-                        stmt.symbol,
-                        stmt.fiscal_year,
-                        stmt.revenue,
-                        stmt.rd_expense,
-                        stmt.net_income,
-                    ])
-                if (i + 1) % 50 == 0:
-                    print(f"  Processed {i + 1}/{len(symbols)} symbols")
+                statements, profile, symbol_returns, errors = future.result()
             except Exception as e:
                 print(f"  Error fetching {symbol}: {e}")
+                continue
+            
+            for error in errors:
+                print(f"  Error fetching {symbol} {error}")
+            
+            for stmt in statements:
+                income["symbol"].append(stmt.symbol)
+                income["fiscal_year"].append(stmt.fiscal_year)
+                income["revenue"].append(stmt.revenue)
+                income["rd_expense"].append(stmt.rd_expense)
+                income["net_income"].append(stmt.net_income)
+            
+            if profile is not None:
+                for column in profiles:
+                    profiles[column].append(getattr(profile, column))
+            
+            for year, ret in symbol_returns:
+                annual_returns["symbol"].append(symbol)
+                annual_returns["year"].append(year)
+                annual_returns["annual_return"].append(ret)
+            
+            if (i + 1) % 50 == 0:
+                print(f"  Processed {i + 1}/{len(symbols)} symbols")
+    
+    _write_parquet(f"{output_dir}/income_statements.parquet", income, _INCOME_COLUMNS)
+    if include_profiles:
+        _write_parquet(f"{output_dir}/company_profiles.parquet", profiles, _PROFILE_COLUMNS)
+    if include_returns:
+        _write_parquet(f"{output_dir}/annual_returns.parquet", annual_returns, _RETURN_COLUMNS)
     
     print(f"Data saved to {output_dir}/")
 
 
+def _write_parquet(path: str, columns: Dict[str, List], types: Dict[str, str]) -> None:
+    """
+    Write a dict of equal-length columns as a zstd-compressed Parquet file.
+    
+    Args:
+        path: Output file path
+        columns: {column name: values}
+        types: {column name: Arrow type alias}, e.g. "string" or "float64"
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = pa.schema([(name, pa.type_for_alias(alias)) for name, alias in types.items()])
+    pq.write_table(pa.Table.from_pydict(columns, schema=schema), path, compression="zstd")
+
+
+def load_income_statements(path: str) -> Dict[str, Dict[int, Dict]]:
+    """
+    Load income statements written by fetch_research_data.
+    
+    The file is memory-mapped and numeric columns are read as NumPy
+    arrays in bulk; the nested per-symbol dicts are then built row by
+    row in Python.
+    
+    Args:
+        path: Path to income_statements.parquet
+        
+    Returns:
+        {symbol: {fiscal_year: {revenue, rd_expense, net_income}}},
+        the financial_data layout used by PortfolioBacktester
+    """
+    import pyarrow.parquet as pq
+    
+    table = pq.read_table(path, memory_map=True)
+    symbols = table.column("symbol").to_pylist()
+    fiscal_years = table.column("fiscal_year").to_numpy()
+    revenue = table.column("revenue").to_numpy()
+    rd_expense = table.column("rd_expense").to_numpy()
+    net_income = table.column("net_income").to_numpy()
+    
+    financial_data: Dict[str, Dict[int, Dict]] = {}
+    for i, symbol in enumerate(symbols):
+        financial_data.setdefault(symbol, {})[int(fiscal_years[i])] = {
+            "revenue": float(revenue[i]),
+            "rd_expense": float(rd_expense[i]),
+            "net_income": float(net_income[i]),
+        }
+    
+    return financial_data
+
+
 if __name__ == "__main__":
     # Example: Fetch data for a few symbols
     client = FMPClient()
@@ -16,10 +16,36 @@ Reference: Fama & MacBeth (1973), Newey & West (1987)
 """
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 from scipy import stats
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels run as plain NumPy
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _newey_west_se(x: np.ndarray, lags: int) -> float:
+    """
+    Newey-West (1987) HAC standard error of the mean of x.
+    
+    Long-run variance is gamma_0 + 2 * sum_{k=1..L} (1 - k/(L+1)) * gamma_k,
+    with Bartlett kernel weights and autocovariances gamma_k scaled by 1/n.
+    """
+    n = x.size
+    demeaned = x - x.mean()
+    long_run_var = (demeaned * demeaned).sum() / n
+    for k in range(1, lags + 1):
+        gamma_k = (demeaned[k:] * demeaned[:n - k]).sum() / n
+        long_run_var += 2.0 * (1.0 - k / (lags + 1.0)) * gamma_k
+    return np.sqrt(max(long_run_var, 0.0) / n)
+
 
 @dataclass
 class QuintileStats:
@@ -56,6 +82,8 @@ class FactorAnalyzer:
         premium = analyzer.compute_q5_q1_spread()
     """
     
+    NEWEY_WEST_LAGS = 3
+    
     def __init__(
         self,
         rd_intensities: Dict[str, Dict[int, float]],
@@ -73,6 +101,97 @@ class FactorAnalyzer:
         self.rd_intensities = rd_intensities
         self.returns = returns
         self.risk_free_rate = risk_free_rate
+        self._build_matrices()
+    
+    def _build_matrices(self) -> None:
+        """
+        Stack the nested dict inputs into dense (symbol, year) arrays.
+        
+        Non-positive or missing R&D intensities and missing returns are
+        stored as NaN. Columns run contiguously from self._first_year.
+        """
+        self._symbols = list(self.rd_intensities)
+        self._symbols += [s for s in self.returns if s not in self.rd_intensities]
+        self._symbol_index = {s: i for i, s in enumerate(self._symbols)}
+        
+        years = set()
+        for yearly in self.rd_intensities.values():
+            years.update(yearly)
+        for yearly in self.returns.values():
+            years.update(yearly)
+        
+        self._first_year = min(years) if years else 0
+        n_years = (max(years) - self._first_year + 1) if years else 0
+        shape = (len(self._symbols), n_years)
+        
+        self._rd = np.full(shape, np.nan)
+        self._ret = np.full(shape, np.nan)
+        
+        for symbol, yearly in self.rd_intensities.items():
+            row = self._symbol_index[symbol]
+            for year, rd in yearly.items():
+                if rd is not None and rd > 0:
+                    self._rd[row, year - self._first_year] = rd
+        
+        for symbol, yearly in self.returns.items():
+            row = self._symbol_index[symbol]
+            for year, ret in yearly.items():
+                if ret is not None:
+                    self._ret[row, year - self._first_year] = ret
+    
+    def _year_index(self, year: int) -> Optional[int]:
+        """Column index for a year, or None if outside the data range."""
+        col = year - self._first_year
+        if 0 <= col < self._rd.shape[1]:
+            return col
+        return None
+    
+    @cached_property
+    def _quintiles(self) -> np.ndarray:
+        """
+        Quintile of every (symbol, fiscal year) cell in one vectorized rank.
+        
+        Ranks ascending R&D intensity within each year column; quintile
+        is min(5, rank // (n // 5) + 1). Cells without data, and years with
+        fewer than five ranked stocks, are 0. Computed once and shared by
+        every quintile method.
+        """
+        valid = ~np.isnan(self._rd)
+        keyed = np.where(valid, self._rd, np.inf)
+        order = np.argsort(keyed, axis=0, kind="stable")
+        ranks = np.argsort(order, axis=0, kind="stable")
+        
+        counts = valid.sum(axis=0)
+        quintile_size = np.maximum(counts // 5, 1)
+        quintiles = np.minimum(5, ranks // quintile_size + 1)
+        
+        return np.where(valid & (counts >= 5), quintiles, 0).astype(np.int8)
+    
+    def _quintile_return_matrix(self, start_year: int, end_year: int) -> np.ndarray:
+        """
+        Equal-weighted quintile returns for every year in one reduction.
+        
+        Builds a (5, symbol, year) membership mask from FY(T-1) quintiles
+        and T-year returns and reduces over symbols. Returns a (5, year)
+        array with NaN where a quintile has no returns.
+        """
+        n_periods = max(end_year - start_year + 1, 0)
+        quintiles = np.zeros((len(self._symbols), n_periods), dtype=np.int8)
+        returns = np.full((len(self._symbols), n_periods), np.nan)
+        
+        for t, year in enumerate(range(start_year, end_year + 1)):
+            ret_col = self._year_index(year)
+            data_col = self._year_index(year - 1)
+            if ret_col is not None and data_col is not None:
+                quintiles[:, t] = self._quintiles[:, data_col]
+                returns[:, t] = self._ret[:, ret_col]
+        
+        has_return = ~np.isnan(returns)
+        masks = (quintiles[None] == np.arange(1, 6)[:, None, None]) & has_return[None]
+        
+        sums = np.where(masks, returns[None], 0.0).sum(axis=1)
+        counts = masks.sum(axis=1)
+        return np.divide(sums, counts, out=np.full(counts.shape, np.nan), where=counts > 0)
     
     def assign_quintiles(
         self,
@@ -83,28 +202,14 @@ class FactorAnalyzer:
         
         Uses FY(T-1) data for T-year quintile assignment.
         """
-        data_year = year - 1
-        
-        rd_values = []
-        for symbol, yearly_rd in self.rd_intensities.items():
-            rd = yearly_rd.get(data_year)
-            if rd is not None and rd > 0:
-                rd_values.append((symbol, rd))
-        
-        if len(rd_values) < 5:
+        data_col = self._year_index(year - 1)
+        if data_col is None:
             return {}
         
-        rd_values.sort(key=lambda x: x[1])
-        
-        n = len(rd_values)
-        quintile_size = n // 5
-        
-        assignments = {}
-        for i, (symbol, _) in enumerate(rd_values):
-            quintile = min(5, (i // quintile_size) + 1)
-            assignments[symbol] = quintile
-        
-        return assignments
+        q_col = self._quintiles[:, data_col]
+        return {
+            self._symbols[i]: int(q_col[i]) for i in np.flatnonzero(q_col)
+        }
     
     def compute_quintile_returns(
         self,
@@ -114,17 +219,26 @@ class FactorAnalyzer:
         """
         Compute equal-weighted return for each quintile in a year.
         """
-        quintile_returns = {q: [] for q in range(1, 6)}
+        col = self._year_index(year)
+        known = [
+            (self._symbol_index[s], q)
+            for s, q in quintile_assignments.items()
+            if s in self._symbol_index
+        ]
+        rows = np.array([row for row, _ in known], dtype=np.intp)
+        quintiles = np.array([q for _, q in known], dtype=np.int8)
         
-        for symbol, quintile in quintile_assignments.items():
-            ret = self.returns.get(symbol, {}).get(year)
-            if ret is not None:
-                quintile_returns[quintile].append(ret)
+        if col is None:
+            rets = np.full(len(rows), np.nan)
+        else:
+            rets = self._ret[rows, col]
+        has_ret = ~np.isnan(rets)
         
-        return {
-            q: np.mean(rets) if rets else np.nan
-            for q, rets in quintile_returns.items()
-        }
+        quintile_returns = {}
+        for q in range(1, 6):
+            q_rets = rets[(quintiles == q) & has_ret]
+            quintile_returns[q] = q_rets.mean() if q_rets.size else np.nan
+        return quintile_returns
     
     def compute_quintile_stats(
         self,
@@ -141,33 +255,26 @@ class FactorAnalyzer:
         Returns:
             List of QuintileStats for quintiles 1 through 5
         """
-        all_returns = {q: [] for q in range(1, 6)}
+        q_returns = self._quintile_return_matrix(start_year, end_year)
+        has_return = ~np.isnan(q_returns)
+        n_obs = has_return.sum(axis=1)
         
-        for year in range(start_year, end_year + 1):
-            assignments = self.assign_quintiles(year)
-            if not assignments:
-                continue
-            
-            year_returns = self.compute_quintile_returns(year, assignments)
-            
-            for q, ret in year_returns.items():
-                if not np.isnan(ret):
-                    all_returns[q].append(ret)
+        filled = np.where(has_return, q_returns, 0.0)
+        avgs = np.divide(filled.sum(axis=1), n_obs, out=np.zeros(5), where=n_obs > 0)
+        sq_dev = np.where(has_return, (q_returns - avgs[:, None]) ** 2, 0.0)
+        stds = np.sqrt(np.divide(sq_dev.sum(axis=1), n_obs - 1, out=np.zeros(5), where=n_obs >= 2))
         
         stats_list = []
-        for q in range(1, 6):
-            rets = all_returns[q]
-            if len(rets) >= 2:
-                avg = np.mean(rets)
-                std = np.std(rets, ddof=1)
-                n = len(rets)
+        for i, q in enumerate(range(1, 6)):
+            n = int(n_obs[i])
+            avg = float(avgs[i])
+            if n >= 2:
+                std = float(stds[i])
                 t_stat = avg / (std / np.sqrt(n)) if std > 0 else 0.0
                 excess = avg - self.risk_free_rate
                 sharpe = excess / std if std > 0 else 0.0
             else:
-                avg = np.mean(rets) if rets else 0.0
                 std = 0.0
-                n = len(rets)
                 t_stat = 0.0
                 sharpe = 0.0
             
@@ -186,38 +293,39 @@ class FactorAnalyzer:
         self,
         start_year: int,
         end_year: int,
+        lags: Optional[int] = None,
     ) -> Tuple[float, float, float]:
         """
         Compute Q5-Q1 (high minus low R&D) spread.
         
+        The t-statistic uses Newey-West standard errors to allow for
+        serial correlation in annual spreads.
+        
+        Args:
+            start_year: First year of analysis
+            end_year: Last year of analysis
+            lags: Newey-West lag length (default NEWEY_WEST_LAGS)
+            
         Returns:
             Tuple of (average spread, t-statistic, p-value)
         """
-        spreads = []
-        
-        for year in range(start_year, end_year + 1):
-            assignments = self.assign_quintiles(year)
-            if not assignments:
-                continue
-            
-            year_returns = self.compute_quintile_returns(year, assignments)
-            
-            q5_ret = year_returns.get(5)
-            q1_ret = year_returns.get(1)
-            
-            if q5_ret is not None and q1_ret is not None:
-                if not np.isnan(q5_ret) and not np.isnan(q1_ret):
-                    spreads.append(q5_ret - q1_ret)
+        q_returns = self._quintile_return_matrix(start_year, end_year)
+        spreads = q_returns[4] - q_returns[0]
+        spreads = spreads[~np.isnan(spreads)]
         
         if len(spreads) < 2:
             return (0.0, 0.0, 1.0)
         
-        avg_spread = np.mean(spreads)
-        std_spread = np.std(spreads, ddof=1)
-        n = len(spreads)
+        avg_spread = spreads.mean()
+        n = spreads.size
+        
+        if lags is None:
+            lags = self.NEWEY_WEST_LAGS
+        lags = min(lags, n - 1)
         
-        t_stat = avg_spread / (std_spread / np.sqrt(n)) if std_spread > 0 else 0.0
-        p_value = 2 * (1 - stats.t.cdf(abs(t_stat), df=n-1))
+        se = _newey_west_se(spreads, lags)
+        t_stat = avg_spread / se if se > 0 else 0.0
+        p_value = 2 * stats.t.sf(abs(t_stat), df=n-1)
         
         return (avg_spread, t_stat, p_value)
     
@@ -1,3 +1,3 @@
 # R&D Alpha Scoring Module
-from .rd_alpha_scorer import RDAlphaScorer, RDAlphaScore, SP500_SECTOR_WEIGHTS
+from .rd_alpha_scorer import RDAlphaScorer, RDAlphaScore, RDAlphaScoreBatch, SP500_SECTOR_WEIGHTS
 
@@ -19,10 +19,28 @@ Components:
 Reference: Lev & Sougiannis (1996), Chan et al. (2001)
 """
 
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, List, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+import heapq
+import math
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; batches are scored with plain NumPy
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 
 # S&P 500 Sector Weights (December 2024)
 # Source: S&P Dow Jones Indices
@@ -54,8 +72,19 @@ SECTOR_RD_CAPS = {
     "default": 1.00,
 }
 
+# Import-time lookup tables for the default configuration, shared by every
+# scorer that does not override the weights or caps. Index = sector code;
+# the cap table has a trailing slot for unknown sectors.
+_SECTOR_NAMES = tuple(sorted((set(SP500_SECTOR_WEIGHTS) | set(SECTOR_RD_CAPS)) - {"default"}))
+_SECTOR_CODES = {name: i for i, name in enumerate(_SECTOR_NAMES)}
+_SECTOR_CAP_ARR = np.array(
+    [SECTOR_RD_CAPS.get(s, SECTOR_RD_CAPS["default"]) for s in _SECTOR_NAMES]
+    + [SECTOR_RD_CAPS["default"]],
+    dtype=np.float64,
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class RDAlphaScore:
     """
     Complete scoring breakdown for a single company.
@@ -93,6 +122,159 @@ class RDAlphaScore:
     latest_rd_expense: float = 0.0
 
 
+@dataclass
+class RDAlphaScoreBatch:
+    """
+    Columnar R&D Alpha scores for a universe of companies.
+    
+    Each attribute is an array aligned by row and mirrors the field of
+    the same name on RDAlphaScore. Rows are only materialized as
+    RDAlphaScore objects on request, typically for the selected top N.
+    """
+    symbol: np.ndarray
+    name: np.ndarray
+    sector: np.ndarray
+    rd_intensity: np.ndarray
+    rd_intensity_capped: np.ndarray
+    sector_adjustment: np.ndarray
+    momentum_factor: np.ndarray
+    quality_score: np.ndarray
+    volatility: np.ndarray
+    raw_score: np.ndarray
+    final_score: np.ndarray
+    latest_revenue: np.ndarray
+    latest_rd_expense: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.final_score)
+    
+    def to_scores(self, indices: Optional[Sequence[int]] = None) -> List[RDAlphaScore]:
+        """Materialize RDAlphaScore objects for the given rows (default all)."""
+        if indices is None:
+            indices = range(len(self))
+        return [
+            RDAlphaScore(
+                symbol=str(self.symbol[i]),
+                name=str(self.name[i]),
+                sector=str(self.sector[i]),
+                rd_intensity=float(self.rd_intensity[i]),
+                rd_intensity_capped=float(self.rd_intensity_capped[i]),
+                sector_adjustment=float(self.sector_adjustment[i]),
+                momentum_factor=float(self.momentum_factor[i]),
+                quality_score=float(self.quality_score[i]),
+                volatility=float(self.volatility[i]),
+                raw_score=float(self.raw_score[i]),
+                final_score=float(self.final_score[i]),
+                latest_revenue=float(self.latest_revenue[i]),
+                latest_rd_expense=float(self.latest_rd_expense[i]),
+            )
+            for i in indices
+        ]
+
+
+@njit(parallel=True, cache=True)
+def _score_kernel(
+    rd_expense: np.ndarray,
+    revenue: np.ndarray,
+    sector_cap: np.ndarray,
+    sector_adj: np.ndarray,
+    prior_return: np.ndarray,
+    benchmark_return: float,
+    quality: np.ndarray,
+    volatility: np.ndarray,
+    default_volatility: float,
+    volatility_floor: float,
+    min_momentum: float,
+    max_momentum: float,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Fused single-pass scoring loop over all companies.
+    
+    Returns:
+        Tuple of (rd_intensity, rd_intensity_capped, sector_adjustment,
+        momentum_factor, quality_score, volatility, raw_score,
+        final_score), with RDAlphaScore defaults on non-positive
+        revenue rows
+    """
+    n = revenue.shape[0]
+    rd_intensity = np.zeros(n)
+    capped = np.zeros(n)
+    adj = np.ones(n)
+    momentum = np.ones(n)
+    qual = np.ones(n)
+    vol = np.full(n, 0.20)
+    raw = np.zeros(n)
+    final = np.zeros(n)
+    
+    for i in prange(n):
+        if revenue[i] > 0:
+            rdi = rd_expense[i] / revenue[i] * 100.0
+            c = min(rdi, sector_cap[i] * 100)
+            mom = min(max(1.0 + (prior_return[i] - benchmark_return) * 0.1, min_momentum), max_momentum)
+            v = volatility[i]
+            if np.isnan(v):
+                v = default_volatility
+            v = max(v, volatility_floor)
+            r = c * sector_adj[i] * mom * quality[i]
+            
+            rd_intensity[i] = rdi
+            capped[i] = c
+            adj[i] = sector_adj[i]
+            momentum[i] = mom
+            qual[i] = quality[i]
+            vol[i] = v
+            raw[i] = r
+            final[i] = r / v
+    
+    return rd_intensity, capped, adj, momentum, qual, vol, raw, final
+
+
+def _score_numpy(
+    rd_expense: np.ndarray,
+    revenue: np.ndarray,
+    sector_cap: np.ndarray,
+    sector_adj: np.ndarray,
+    prior_return: np.ndarray,
+    benchmark_return: float,
+    quality: np.ndarray,
+    volatility: np.ndarray,
+    default_volatility: float,
+    volatility_floor: float,
+    min_momentum: float,
+    max_momentum: float,
+) -> Tuple[np.ndarray, ...]:
+    """NumPy equivalent of _score_kernel, used when numba is unavailable."""
+    valid = revenue > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rd_intensity = np.where(valid, rd_expense / revenue * 100.0, 0.0)
+    capped = np.minimum(rd_intensity, sector_cap * 100)
+    
+    momentum = np.clip(
+        1.0 + (prior_return - benchmark_return) * 0.1,
+        min_momentum,
+        max_momentum,
+    )
+    vol = np.fmax(np.nan_to_num(volatility, nan=default_volatility), volatility_floor)
+    
+    raw = capped * sector_adj * momentum * quality
+    final = raw / vol
+    
+    # Non-positive revenue rows keep RDAlphaScore defaults
+    return (
+        rd_intensity,
+        np.where(valid, capped, 0.0),
+        np.where(valid, sector_adj, 1.0),
+        np.where(valid, momentum, 1.0),
+        np.where(valid, quality, 1.0),
+        np.where(valid, vol, 0.20),
+        np.where(valid, raw, 0.0),
+        np.where(valid, final, 0.0),
+    )
+
+
+_score_arrays = _score_kernel if NUMBA_AVAILABLE else _score_numpy
+
+
 class RDAlphaScorer:
     """
     Research-based scoring engine for R&D Alpha portfolio construction.
@@ -105,7 +287,7 @@ class RDAlphaScorer:
     
     Usage:
         scorer = RDAlphaScorer()
-        scores = scorer.calculate_scores(companies_df)
+        scores = scorer.score_dataframe(companies_df)
         top_20 = scorer.select_top_n(scores, n=20)
     """
     
@@ -116,6 +298,11 @@ class RDAlphaScorer:
     MIN_MOMENTUM_FACTOR = 0.5
     MAX_MOMENTUM_FACTOR = 2.0
     
+    # Sectors downweighted by the sector adjustment
+    _HIGH_RD_SECTORS: ClassVar[frozenset] = frozenset(
+        {"Technology", "Information Technology", "Healthcare", "Health Care"}
+    )
+    
     def __init__(
         self,
         sector_weights: Optional[Dict[str, float]] = None,
@@ -123,27 +310,53 @@ class RDAlphaScorer:
     ):
         self.sector_weights = sector_weights or SP500_SECTOR_WEIGHTS
         self.sector_caps = sector_caps or SECTOR_RD_CAPS
+        self._build_sector_caches()
+    
+    def _build_sector_caches(self) -> None:
+        """Precompute per-sector lookups used on every scored company."""
+        self._default_sector_cap = self.sector_caps.get("default", 1.0)
+        
+        self._high_rd_total = sum(
+            self.sector_weights.get(s, 0.0) for s in self._HIGH_RD_SECTORS
+        )
+        self._sector_adjustment = {
+            s: self.sector_weights.get(s, 0.10) / self._high_rd_total
+            for s in self._HIGH_RD_SECTORS
+        } if self._high_rd_total > 0 else {}
+        
+        # Integer-coded lookup tables for batched scoring. The extra last
+        # slot holds the values for unknown sectors, so code -1 gathers it
+        if self.sector_weights is SP500_SECTOR_WEIGHTS and self.sector_caps is SECTOR_RD_CAPS:
+            all_sectors = _SECTOR_NAMES
+            self._sector_to_code = _SECTOR_CODES
+            self._cap_lut = _SECTOR_CAP_ARR
+        else:
+            all_sectors = sorted(
+                (set(self.sector_weights) | set(self.sector_caps) | self._HIGH_RD_SECTORS) - {"default"}
+            )
+            self._sector_to_code = {name: i for i, name in enumerate(all_sectors)}
+            self._cap_lut = np.array(
+                [self.get_sector_cap(s) for s in all_sectors] + [self._default_sector_cap],
+                dtype=np.float64,
+            )
+        self._adj_lut = np.array(
+            [self.get_sector_adjustment(s) for s in all_sectors] + [1.0],
+            dtype=np.float64,
+        )
     
     def get_sector_cap(self, sector: str) -> float:
         """Get R&D intensity cap for a sector."""
-        return self.sector_caps.get(sector, self.sector_caps.get("default", 1.0))
+        return self.sector_caps.get(sector, self._default_sector_cap)
     
     def get_sector_adjustment(self, sector: str) -> float:
         """
         Calculate sector adjustment to prevent overconcentration.
         
         High-R&D sectors (tech, healthcare) are downweighted to maintain
-        diversification across the portfolio.
+        diversification across the portfolio. Adjustments are computed
+        once at construction.
         """
-        high_rd_sectors = {"Technology", "Information Technology", "Healthcare", "Health Care"}
-        if sector in high_rd_sectors:
-            target = self.sector_weights.get(sector, 0.10)
-            high_rd_total = sum(
-                self.sector_weights.get(s, 0.0) for s in high_rd_sectors
-            )
-            if high_rd_total > 0:
-                return target / high_rd_total
-        return 1.0
+        return self._sector_adjustment.get(sector, 1.0)
     
     def calculate_momentum_factor(
         self,
@@ -162,7 +375,12 @@ class RDAlphaScorer:
         """
         excess = prior_return - benchmark_return
         factor = 1.0 + (excess * 0.1)
-        return np.clip(factor, self.MIN_MOMENTUM_FACTOR, self.MAX_MOMENTUM_FACTOR)
+        # Plain comparisons: np.clip on a scalar goes through ufunc dispatch
+        if factor < self.MIN_MOMENTUM_FACTOR:
+            return self.MIN_MOMENTUM_FACTOR
+        if factor > self.MAX_MOMENTUM_FACTOR:
+            return self.MAX_MOMENTUM_FACTOR
+        return factor
     
     def score_company(
         self,
@@ -185,7 +403,7 @@ class RDAlphaScorer:
             sector: GICS sector
             rd_expense: Annual R&D expense (dollars)
             revenue: Annual revenue (dollars)
-            volatility: 3-year standard deviation (optional)
+            volatility: 3-year standard deviation (None or NaN uses default)
             prior_3yr_return: Company's cumulative 3-year return
             benchmark_3yr_return: S&P 500 cumulative 3-year return
             quality_score: Data quality (0 to 1)
@@ -202,7 +420,11 @@ class RDAlphaScorer:
         
         sector_adj = self.get_sector_adjustment(sector)
         momentum = self.calculate_momentum_factor(prior_3yr_return, benchmark_3yr_return)
-        vol = max(volatility or self.DEFAULT_VOLATILITY, self.VOLATILITY_FLOOR)
+        # Only a missing value takes the default; 0.0 is floored like any other
+        if volatility is None or math.isnan(volatility):
+            vol = self.DEFAULT_VOLATILITY
+        else:
+            vol = volatility if volatility >= self.VOLATILITY_FLOOR else self.VOLATILITY_FLOOR
         
         raw_score = rd_intensity_capped * sector_adj * momentum * quality_score
         final_score = raw_score / vol
@@ -223,9 +445,196 @@ class RDAlphaScorer:
             latest_rd_expense=rd_expense,
         )
     
+    def score_companies_vec(
+        self,
+        symbols: Sequence[str],
+        names: Sequence[str],
+        sectors: Sequence[str],
+        rd_expense: np.ndarray,
+        revenue: np.ndarray,
+        volatility: Optional[np.ndarray] = None,
+        prior_3yr_return: Optional[np.ndarray] = None,
+        benchmark_3yr_return: float = 0.0,
+        quality_score: Optional[np.ndarray] = None,
+    ) -> RDAlphaScoreBatch:
+        """
+        Calculate R&D Alpha scores for many companies with array operations.
+        
+        Applies the same formula as score_company to whole columns at once.
+        Companies with non-positive revenue get the default (zero) score.
+        
+        Args:
+            symbols: Stock tickers
+            names: Company names
+            sectors: GICS sectors
+            rd_expense: Annual R&D expense (dollars)
+            revenue: Annual revenue (dollars)
+            volatility: 3-year standard deviation; NaN or omitted uses default
+            prior_3yr_return: Companies' cumulative 3-year returns (default 0)
+            benchmark_3yr_return: S&P 500 cumulative 3-year return
+            quality_score: Data quality (0 to 1, default 1)
+            
+        Returns:
+            RDAlphaScoreBatch with one row per company
+            
+        Raises:
+            ValueError: If any column's length differs from len(symbols)
+        """
+        n = len(symbols)
+        rd_expense = np.asarray(rd_expense, dtype=np.float64)
+        revenue = np.asarray(revenue, dtype=np.float64)
+        volatility = (
+            np.full(n, np.nan) if volatility is None
+            else np.asarray(volatility, dtype=np.float64)
+        )
+        prior_3yr_return = (
+            np.zeros(n) if prior_3yr_return is None
+            else np.asarray(prior_3yr_return, dtype=np.float64)
+        )
+        quality_score = (
+            np.ones(n) if quality_score is None
+            else np.asarray(quality_score, dtype=np.float64)
+        )
+        
+        # The compiled kernel does no bounds checking, so a short column
+        # would be read past its end instead of raising
+        for label, column in (("names", names), ("sectors", sectors)):
+            if len(column) != n:
+                raise ValueError(f"{label} has length {len(column)}, expected {n} (one per symbol)")
+        for label, column in (
+            ("rd_expense", rd_expense),
+            ("revenue", revenue),
+            ("volatility", volatility),
+            ("prior_3yr_return", prior_3yr_return),
+            ("quality_score", quality_score),
+        ):
+            if column.shape != (n,):
+                raise ValueError(f"{label} has shape {column.shape}, expected ({n},) (one per symbol)")
+        
+        codes = np.fromiter(
+            (self._sector_to_code.get(s, -1) for s in sectors), dtype=np.int16, count=n
+        )
+        sector_cap = self._cap_lut[codes]
+        sector_adj = self._adj_lut[codes]
+        
+        (
+            rd_intensity,
+            rd_intensity_capped,
+            sector_adj,
+            momentum,
+            quality_score,
+            vol,
+            raw_score,
+            final_score,
+        ) = _score_arrays(
+            rd_expense,
+            revenue,
+            sector_cap,
+            sector_adj,
+            prior_3yr_return,
+            float(benchmark_3yr_return),
+            quality_score,
+            volatility,
+            self.DEFAULT_VOLATILITY,
+            self.VOLATILITY_FLOOR,
+            self.MIN_MOMENTUM_FACTOR,
+            self.MAX_MOMENTUM_FACTOR,
+        )
+        
+        valid = revenue > 0
+        return RDAlphaScoreBatch(
+            symbol=np.asarray(symbols, dtype=object),
+            name=np.asarray(names, dtype=object),
+            sector=np.asarray(sectors, dtype=object),
+            rd_intensity=rd_intensity,
+            rd_intensity_capped=rd_intensity_capped,
+            sector_adjustment=sector_adj,
+            momentum_factor=momentum,
+            quality_score=quality_score,
+            volatility=vol,
+            raw_score=raw_score,
+            final_score=final_score,
+            latest_revenue=np.where(valid, revenue, 0.0),
+            latest_rd_expense=np.where(valid, rd_expense, 0.0),
+        )
+    
+    def score_dataframe(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Score a DataFrame of companies column-wise.
+        
+        Required columns are symbol, sector, rd_expense and revenue. The
+        optional columns name, volatility, prior_3yr_return,
+        benchmark_3yr_return and quality_score take score_company's
+        defaults when absent.
+        
+        The result can be passed to select_top_n, which ranks by the
+        'rd_alpha_score' column as it stands (so edits to it are honoured)
+        and recomputes the score components only for the selected rows.
+        
+        Args:
+            df: One row per company
+            
+        Returns:
+            Copy of df with an added 'rd_alpha_score' column
+            
+        Raises:
+            KeyError: If a required column is missing
+        """
+        out = df.copy()
+        out["rd_alpha_score"] = self._score_frame(df).final_score
+        return out
+    
+    def _score_frame(self, df: "pd.DataFrame") -> RDAlphaScoreBatch:
+        """Run score_companies_vec over the columns of a DataFrame."""
+        n = len(df)
+        if n == 0:
+            # An empty frame may carry no columns at all
+            df = df.assign(**{
+                c: [] for c in ("symbol", "sector", "rd_expense", "revenue") if c not in df
+            })
+        
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in df:
+                return np.full(n, default)
+            return df[name].to_numpy(dtype=np.float64)
+        
+        # A per-row benchmark is folded into the prior return, so the
+        # kernel sees the same excess return with a zero benchmark
+        excess_return = column("prior_3yr_return", 0.0) - column("benchmark_3yr_return", 0.0)
+        
+        symbols = df["symbol"].to_numpy(dtype=object)
+        return self.score_companies_vec(
+            symbols=symbols,
+            names=df["name"].to_numpy(dtype=object) if "name" in df else symbols,
+            sectors=df["sector"].to_numpy(dtype=object),
+            rd_expense=df["rd_expense"].to_numpy(dtype=np.float64),
+            revenue=df["revenue"].to_numpy(dtype=np.float64),
+            volatility=column("volatility", np.nan),
+            prior_3yr_return=excess_return,
+            quality_score=column("quality_score", 1.0),
+        )
+    
+    @staticmethod
+    def _top_k_order(final_scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Indices of the k highest scores, sorted descending.
+        
+        Finds the k-th largest value with an O(N) np.partition, keeps every
+        score tied with it, and sorts only that pool. Ties stay in input
+        order, matching a stable full sort.
+        """
+        if k >= final_scores.size:
+            candidates = np.arange(final_scores.size)
+        elif k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        else:
+            kth = np.partition(final_scores, final_scores.size - k)[final_scores.size - k]
+            candidates = np.flatnonzero(final_scores >= kth)
+        return candidates[np.argsort(-final_scores[candidates], kind="stable")]
+    
     def select_top_n(
         self,
-        scores: List[RDAlphaScore],
+        scores: Union[List[RDAlphaScore], RDAlphaScoreBatch, "pd.DataFrame"],
         n: int = 20,
         equal_weight: bool = True,
     ) -> List[RDAlphaScore]:
@@ -236,42 +645,174 @@ class RDAlphaScorer:
         max 25% in any single sector.
         
         Args:
-            scores: List of RDAlphaScore objects
+            scores: List of RDAlphaScore objects, an RDAlphaScoreBatch, or
+                a DataFrame in the score_dataframe layout. A DataFrame is
+                ranked by its 'rd_alpha_score' column when present and is
+                scored first otherwise. For batches and DataFrames only
+                the selected rows are materialized.
             n: Number of holdings to select
             equal_weight: If True, assign equal weights; otherwise score-weighted
             
         Returns:
             Top N companies with assigned weights and ranks
         """
-        sorted_scores = sorted(scores, key=lambda x: x.final_score, reverse=True)
+        frame = None
+        if not isinstance(scores, (list, RDAlphaScoreBatch)) and hasattr(scores, "columns"):
+            if "rd_alpha_score" in scores:
+                frame = scores
+            else:
+                scores = self._score_frame(scores)
+        
+        is_batch = isinstance(scores, RDAlphaScoreBatch)
+        if frame is not None:
+            final_scores = frame["rd_alpha_score"].to_numpy(dtype=np.float64)
+            # An empty frame may carry no columns beyond the score
+            sectors = (
+                frame["sector"].to_numpy(dtype=object) if len(frame)
+                else np.zeros(0, dtype=object)
+            )
+        elif is_batch:
+            final_scores = scores.final_score
+            sectors = scores.sector
+        else:
+            final_scores = np.fromiter(
+                (s.final_score for s in scores), dtype=np.float64, count=len(scores)
+            )
+            sectors = None
         
-        selected = []
-        sector_counts = {}
         max_per_sector = max(1, n // 4)
         
-        for score in sorted_scores:
-            if len(selected) >= n:
-                break
+        # Sector caps can skip candidates, so rank a pool larger than n
+        # and widen it only if the pool runs out before n are picked
+        pool_size = min(len(final_scores), max(n * 4, n + 50))
+        while True:
+            order = self._top_k_order(final_scores, pool_size)
             
-            current_count = sector_counts.get(score.sector, 0)
-            if current_count >= max_per_sector:
-                continue
+            # Running per-sector count down the ranked pool; a candidate is
+            # allowed while its sector has used at most max_per_sector slots
+            pool_sectors = (
+                sectors[order] if sectors is not None
+                else np.array([scores[i].sector for i in order], dtype=object)
+            )
+            # Encode by first appearance; unlike np.unique this needs no
+            # ordering, so None or NaN sectors are counted like any other
+            sector_codes = {}
+            codes = np.fromiter(
+                (sector_codes.setdefault(s, len(sector_codes)) for s in pool_sectors),
+                dtype=np.intp,
+                count=len(pool_sectors),
+            )
+            onehot = (codes[:, None] == np.arange(codes.max(initial=-1) + 1)[None, :])
+            running = onehot.cumsum(axis=0, dtype=np.int32)
+            allowed = running[np.arange(len(codes)), codes] <= max_per_sector
+            picked = order[np.flatnonzero(allowed)[:n]].tolist()
             
-            sector_counts[score.sector] = current_count + 1
-            selected.append(score)
+            if len(picked) >= n or len(order) >= len(final_scores):
+                break
+            pool_size = min(len(final_scores), pool_size * 2)
         
-        if equal_weight:
-            weight = 1.0 / len(selected) if selected else 0.0
-            for i, s in enumerate(selected):
-                s.weight = weight
-                s.selection_rank = i + 1
+        picked_scores = final_scores[np.asarray(picked, dtype=np.intp)]
+        if frame is not None:
+            # Components come from the input columns; the ranking score
+            # is the frame's own, edits included
+            selected = self._score_frame(frame.iloc[picked]).to_scores()
+            for s, score in zip(selected, picked_scores.tolist()):
+                s.final_score = score
+        elif is_batch:
+            selected = scores.to_scores(picked)
         else:
-            total_score = sum(s.final_score for s in selected)
-            for i, s in enumerate(selected):
-                s.weight = s.final_score / total_score if total_score > 0 else 0.0
-                s.selection_rank = i + 1
+            selected = [scores[i] for i in picked]
+        
+        self._assign_weights(selected, picked_scores, equal_weight)
+        return selected
+    
+    def iter_scores(self, companies: Iterable[Dict[str, Any]]) -> Iterator[RDAlphaScore]:
+        """
+        Lazily score companies one at a time.
         
+        Args:
+            companies: Iterable of dicts holding score_company keyword
+                arguments (symbol, name, sector, rd_expense, revenue, ...)
+                
+        Yields:
+            RDAlphaScore for each company, in input order
+        """
+        for company in companies:
+            yield self.score_company(**company)
+    
+    def select_top_n_streaming(
+        self,
+        companies: Iterable[Dict[str, Any]],
+        n: int = 20,
+        equal_weight: bool = True,
+    ) -> List[RDAlphaScore]:
+        """
+        Select top N companies without materializing every score.
+        
+        Gives the same result as select_top_n over the full list. Because
+        a sector can contribute at most max(1, n // 4) holdings, only each
+        sector's best scores so far are kept in a bounded heap; memory
+        grows with the number of sectors, not the universe.
+        
+        Args:
+            companies: Iterable of dicts holding score_company keyword arguments
+            n: Number of holdings to select
+            equal_weight: If True, assign equal weights; otherwise score-weighted
+            
+        Returns:
+            Top N companies with assigned weights and ranks
+        """
+        max_per_sector = max(1, n // 4)
+        
+        # Min-heaps keyed by (score, -position): the root is the weakest
+        # holding, and among equal scores the latest one, as a stable sort
+        # would rank it
+        sector_heaps = defaultdict(list)
+        for position, score in enumerate(self.iter_scores(companies)):
+            entry = (score.final_score, -position, score)
+            heap = sector_heaps[score.sector]
+            if len(heap) < max_per_sector:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        
+        survivors = [entry for heap in sector_heaps.values() for entry in heap]
+        top = heapq.nlargest(n, survivors, key=lambda entry: entry[:2])
+        selected = [entry[2] for entry in top]
+        
+        picked_scores = np.fromiter(
+            (s.final_score for s in selected), dtype=np.float64, count=len(selected)
+        )
+        self._assign_weights(selected, picked_scores, equal_weight)
         return selected
+    
+    @staticmethod
+    def _assign_weights(
+        selected: List[RDAlphaScore],
+        picked_scores: np.ndarray,
+        equal_weight: bool,
+    ) -> None:
+        """Set weight and selection_rank on the selected scores in place."""
+        if equal_weight:
+            weights = np.full(len(selected), 1.0 / len(selected) if selected else 0.0)
+        else:
+            total_score = picked_scores.sum()
+            weights = (
+                picked_scores / total_score if total_score > 0
+                else np.zeros(len(selected))
+            )
+        
+        for i, (s, weight) in enumerate(zip(selected, weights.tolist())):
+            s.weight = weight
+            s.selection_rank = i + 1
+
+
+if NUMBA_AVAILABLE:
+    # Compile (or load the cached build) at import so the first real
+    # batch is not charged for it
+    _one = np.ones(1)
+    _score_kernel(_one, _one, _one, _one, _one, 0.0, _one, _one, 0.25, 0.10, 0.5, 2.0)
+    del _one
 
 
 if __name__ == "__main__":
@@ -286,20 +827,18 @@ if __name__ == "__main__":
         ("XOM", "Exxon Mobil", "Energy", 1_200_000_000, 344_582_000_000, 0.28),
     ]
     
-    scores = []
-    for symbol, name, sector, rd, rev, vol in sample_companies:
-        score = scorer.score_company(
-            symbol=symbol,
-            name=name,
-            sector=sector,
-            rd_expense=rd,
-            revenue=rev,
-            volatility=vol,
-        )
-        scores.append(score)
-        print(f"{symbol}: R&D Intensity={score.rd_intensity:.1f}%, Score={score.final_score:.2f}")
+    symbols, names, sectors, rd, rev, vol = zip(*sample_companies)
+    scores = scorer.score_companies_vec(
+        symbols=symbols,
+        names=names,
+        sectors=sectors,
+        rd_expense=np.array(rd, dtype=np.float64),
+        revenue=np.array(rev, dtype=np.float64),
+        volatility=np.array(vol, dtype=np.float64),
+    )
+    for i, symbol in enumerate(scores.symbol):
+        print(f"{symbol}: R&D Intensity={scores.rd_intensity[i]:.1f}%, Score={scores.final_score[i]:.2f}")
     
     print("\nTop selections:")
     for s in scorer.select_top_n(scores, n=3):
         print(f"  {s.selection_rank}. {s.symbol} ({s.sector}) - Weight: {s.weight:.1%}")
-